@@ -0,0 +1,149 @@
+"""Tokenizing and number-to-words logic for the disclaimer calculator.
+
+Kept out of streamlit_app.py because Streamlit re-executes that script on
+every rerun, which would throw these caches away each time.
+"""
+import re
+from functools import lru_cache
+from num2words import num2words
+
+# --- Configuration ---
+WORDS_TO_IGNORE_IN_NUMBERS = frozenset({"hundred", "thousand", "and"})
+# numbers below this are looked up in a table built once per process
+NUMBER_TABLE_SIZE = 10000
+
+# --- Precompiled Patterns ---
+_URL_RE = re.compile(r'(?:https?://)?(?:www\.)?([a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}(?:/[^\s]*)?')
+_POSTCODE_RE = re.compile(r'\b([A-Z]{1,2}\d[A-Z\d]?)\s*(\d[A-Z]{2})\b', re.IGNORECASE)
+_ABBREV_RE = re.compile(
+    r'(?P<tcs>\bTs?\s?&\s?Cs\b)'
+    r'|(?P<pa>\bp\.?a\.?\b)'
+    r'|(?P<roi>\bR\.?O\.?I\.?\b)'
+    r'|(?P<ni>\bN\.?I\.?\b)',
+    re.IGNORECASE)
+# abbreviations that survive word tokenization are written out directly
+_ABBREV_TOKENS = {
+    'tcs': 'T&Cs',
+    'pa': 'SAFE_TOKEN_PA',
+    'roi': 'ROI',
+    'ni': 'NI',
+}
+# display forms the word tokenizer would split, restored after tokenizing
+_SAFE_TOKEN_DISPLAY = {
+    'SAFE_TOKEN_URL': '[URL]',
+    'SAFE_TOKEN_PA': 'p.a.',
+}
+# anything the protect/split passes below could act on
+_NEEDS_PROTECT_RE = re.compile(r'[.&\d]|\b(?:pa|roi|ni)\b', re.IGNORECASE)
+# alternating digit runs (group 1) and the text between them (group 2)
+_SEGMENT_RE = re.compile(r'(\d+)|(\D+)')
+_WORD_RE = re.compile(r'\b[\w&]+\b')
+# ASCII fast path for _WORD_RE: every char outside [A-Za-z0-9_&] becomes a space
+_NON_WORD_TO_SPACE = {i: ' ' for i in range(128) if not (chr(i).isalnum() or chr(i) in '_&')}
+_SPOKEN_WORD_RE = re.compile(r'\b\w+\b')
+
+# --- Core Logic ---
+
+@lru_cache(maxsize=4096)
+def convert_number_smart(number_val):
+    """Smart logic to handle specific number ranges for ad clearance."""
+    if 1100 <= number_val <= 1999:
+        hundreds = number_val // 100
+        remainder = number_val % 100
+        text = f"{num2words(hundreds)} hundred"
+        if remainder > 0:
+            text += f" and {num2words(remainder)}"
+        return text
+    if 2010 <= number_val <= 2099:
+        return num2words(number_val, to='year')
+    return num2words(number_val)
+
+def _valid_number_words(spoken):
+    """Words of a spoken number, minus the words Clearcast doesn't count."""
+    words = _SPOKEN_WORD_RE.findall(spoken.lower())
+    return tuple(w for w in words if w not in WORDS_TO_IGNORE_IN_NUMBERS)
+
+@lru_cache(maxsize=None)
+def _number_word_table():
+    """Counted words for every number below NUMBER_TABLE_SIZE."""
+    # bypass the lru_cache so the build doesn't flood it
+    return tuple(_valid_number_words(convert_number_smart.__wrapped__(n))
+                 for n in range(NUMBER_TABLE_SIZE))
+
+def number_to_valid_words(number_val):
+    """Counted words for a number, from the table where possible."""
+    if number_val < NUMBER_TABLE_SIZE:
+        return _number_word_table()[number_val]
+    # convert_number_smart's lru_cache covers the rare large numbers
+    return _valid_number_words(convert_number_smart(number_val))
+
+def split_words(text):
+    """Same tokens as _WORD_RE.findall, without the regex engine for ASCII text."""
+    if not text.isascii():
+        return _WORD_RE.findall(text)
+    words = text.translate(_NON_WORD_TO_SPACE).split()
+    if '&' in text:
+        # \b can't sit next to a bare '&', so findall never keeps edge ampersands
+        words = [w for w in (w.strip('&') for w in words) if w]
+    return words
+
+def _tokens_from_text_chunk(chunk):
+    """Word tokens for a digit-free chunk, with safe tokens mapped back."""
+    tokens = split_words(chunk)
+    if 'SAFE_TOKEN_' in chunk:
+        tokens = [_SAFE_TOKEN_DISPLAY.get(t, t) for t in tokens]
+    return tokens
+
+@lru_cache(maxsize=64)
+def _exclusion_pattern(exclusions):
+    """Single case-insensitive regex for a comma separated brand list, or None."""
+    # one branch per distinct brand, whatever its case
+    exclusion_list = {}
+    for e in exclusions.split(','):
+        e = e.strip()
+        if e:
+            exclusion_list.setdefault(e.lower(), e)
+    if not exclusion_list:
+        return None
+    # longest first, so 'Coca Cola' wins over 'Cola' whatever order they're listed in
+    brands = sorted(exclusion_list.values(), key=len, reverse=True)
+    return re.compile('|'.join(map(re.escape, brands)), re.IGNORECASE)
+
+@lru_cache(maxsize=256)
+def extract_tokens(text, exclusions=""):
+    """Parses text into text_tokens and number_strings."""
+    if not text:
+        return (), ()
+
+    # 1. Remove Brand Names / Exclusions
+    pattern = _exclusion_pattern(exclusions)
+    if pattern:
+        text = pattern.sub(" ", text)
+
+    # Fast path: no URLs, postcodes, abbreviations or numbers to handle
+    if not _NEEDS_PROTECT_RE.search(text):
+        return tuple(split_words(text)), ()
+
+    # 2. Protect URLs
+    text = _URL_RE.sub('SAFE_TOKEN_URL', text)
+
+    # 3. Protect Postcodes (search first: most text has none, and sub's setup costs more)
+    if _POSTCODE_RE.search(text):
+        text = _POSTCODE_RE.sub(r'\1 \2', text)
+
+    # 4. Protect Abbreviations
+    # padded, so back-to-back abbreviations ('R.O.I.N.I.') stay separate words
+    text = _ABBREV_RE.sub(lambda m: f" {_ABBREV_TOKENS[m.lastgroup]} ", text)
+
+    # 5. Walk digit runs and the text between them
+    text_tokens = []
+    number_strings = []
+    
+    for m in _SEGMENT_RE.finditer(text):
+        num_str, chunk = m.groups()
+        if num_str:
+            number_strings.append(num_str)
+        else:
+            text_tokens.extend(_tokens_from_text_chunk(chunk))
+
+    return tuple(text_tokens), tuple(number_strings)
@@ -1,125 +1,115 @@
 import streamlit as st
 import re
-from num2words import num2words
+from calculator import extract_tokens, number_to_valid_words, split_words
 
 # --- Configuration ---
-WORDS_TO_IGNORE_IN_NUMBERS = {"hundred", "thousand", "and"}
 FRAMES_PER_SECOND = 25
 MONTHS = ["january", "february", "march", "april", "may", "june",
           "july", "august", "september", "october", "november", "december"]
 # specific words to watch for tips
 SYMBOL_WORDS = ["percent", "pounds", "euros"] 
 
+# --- Precompiled Patterns ---
+# one pass over the lowercased text reports every phrase-based tip
+_TIP_RE = re.compile(
+    r'(?P<tcs>terms and conditions)|(?P<tcs_amp>terms & conditions)'
+    r'|(?P<pa>per annum)|(?P<roi>republic of ireland)|(?P<per>per (?:week|month))')
+# single-word tips are matched against whole tokens, so 'Maynard' isn't a month
+_MONTH_WORDS = frozenset(MONTHS)
+_SYMBOL_WORDS = frozenset(SYMBOL_WORDS)
+
 # --- Core Logic ---
 
-def convert_number_smart(number_val):
-    """Smart logic to handle specific number ranges for ad clearance."""
-    if 1100 <= number_val <= 1999:
-        hundreds = number_val // 100
-        remainder = number_val % 100
-        text = f"{num2words(hundreds)} hundred"
-        if remainder > 0:
-            text += f" and {num2words(remainder)}"
-        return text
-    if 2010 <= number_val <= 2099:
-        return num2words(number_val, to='year')
-    return num2words(number_val)
-
-def extract_tokens(text, exclusions=""):
-    """Parses text into text_tokens and number_strings."""
-    if not text:
-        return [], []
-
-    # 1. Remove Brand Names / Exclusions
-    if exclusions:
-        exclusion_list = [e.strip() for e in exclusions.split(',')]
-        for excl in exclusion_list:
-            if excl:
-                pattern = re.compile(re.escape(excl), re.IGNORECASE)
-                text = pattern.sub(" ", text)
-
-    # 2. Map of Patterns to Safe Tokens
-    token_map = {
-        'SAFE_TOKEN_URL': '[URL]',
-        'SAFE_TOKEN_TCS': 'T&Cs',
-        'SAFE_TOKEN_PA': 'p.a.',
-        'SAFE_TOKEN_ROI': 'ROI',
-        'SAFE_TOKEN_NI': 'NI',
-    }
-
-    # 3. Protect URLs
-    url_regex = r'(?:https?://)?(?:www\.)?([a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}(?:/[^\s]*)?'
-    text = re.sub(url_regex, 'SAFE_TOKEN_URL', text)
-
-    # 4. Protect Postcodes
-    postcode_regex = r'\b([A-Z]{1,2}\d[A-Z\d]?)\s*(\d[A-Z]{2})\b'
-    text = re.sub(postcode_regex, r'\1 \2', text, flags=re.IGNORECASE)
-
-    # 5. Protect Abbreviations
-    abbreviations = [
-        (r'\bTs?\s?&\s?Cs\b', 'SAFE_TOKEN_TCS'), 
-        (r'\bp\.?a\.?\b', 'SAFE_TOKEN_PA'),
-        (r'\bR\.?O\.?I\.?\b', 'SAFE_TOKEN_ROI'),
-        (r'\bN\.?I\.?\b', 'SAFE_TOKEN_NI'),
-    ]
-    for pattern, token in abbreviations:
-        text = re.sub(pattern, token, text, flags=re.IGNORECASE)
-
-    # 6. Split text by numbers
-    parts = re.split(r'(\d+)', text)
-    
-    text_tokens = []
-    number_strings = []
+@st.cache_data(show_spinner=False, max_entries=256)
+def calculate_word_lists(text_tokens, number_strings, counted_tokens=(), counted_numbers=()):
+    """Counts logic: Text (unique words), Numbers (unique number strings).
     
-    for part in parts:
-        if part.isdigit():
-            number_strings.append(part)
-        else:
-            raw_tokens = re.findall(r'\b[\w&]+\b', part)
-            for t in raw_tokens:
-                if t in token_map:
-                    text_tokens.append(token_map[t])
-                else:
-                    text_tokens.append(t)
-
-    return text_tokens, number_strings
-
-def calculate_word_lists(text_tokens, number_strings):
-    """Counts logic: Text (unique words), Numbers (unique number strings)."""
-    final_display_list = []
-    
-    # 1. Process Manual Text
-    unique_text = []
-    seen_text = set()
+    Words and numbers already counted elsewhere (e.g. in the main text) are skipped.
+    Returns (word_count, duration, recognition_time, display_list).
+    """
+    # 1. Process Manual Text (first spelling of each word wins)
+    unique_text = dict.fromkeys(w.lower() for w in counted_tokens)
+    already_counted = len(unique_text)
     for w in text_tokens:
-        w_lower = w.lower()
-        if w_lower not in seen_text:
-            seen_text.add(w_lower)
-            unique_text.append(w)
-            final_display_list.append(w)
+        unique_text.setdefault(w.lower(), w)
+    final_display_list = list(unique_text.values())[already_counted:]
             
     # 2. Process Numbers
-    seen_numbers = set()
     number_words_count = 0
+    counted_numbers = set(counted_numbers)
     
-    for num_str in number_strings:
-        if num_str not in seen_numbers:
-            seen_numbers.add(num_str)
-            spoken = convert_number_smart(int(num_str))
-            words = re.findall(r'\b\w+\b', spoken.lower())
-            valid_words = [w for w in words if w not in WORDS_TO_IGNORE_IN_NUMBERS]
-            number_words_count += len(valid_words)
-            final_display_list.extend(valid_words)
+    for num_str in dict.fromkeys(number_strings):
+        if num_str in counted_numbers:
+            continue
+        valid_words = number_to_valid_words(int(num_str))
+        number_words_count += len(valid_words)
+        final_display_list.extend(valid_words)
             
-    total_count = len(unique_text) + number_words_count
-    return total_count, final_display_list
-
-def calculate_duration(word_count):
-    if word_count == 0:
-        return 0, 0
-    rt = 3.0 if word_count >= 10 else 2.0
-    duration = (word_count * 0.2) + rt
-    return duration, rt
+    total_count = len(unique_text) - already_counted + number_words_count
+
+    # 3. Duration: 0.2s per word plus recognition time
+    if total_count == 0:
+        return 0, 0, 0, tuple(final_display_list)
+    rt = 3.0 if total_count >= 10 else 2.0
+    duration = (total_count * 0.2) + rt
+    return total_count, duration, rt, tuple(final_display_list)
+
+# the first call also builds the number table (~0.5s), so show a spinner
+@st.cache_data(show_spinner="Calculating...", max_entries=128)
+def calculate_totals(main_text, add_text, exclusions, has_additional):
+    """Runs the full pipeline for main and additional text."""
+    # 1. Process Main
+    main_text_tokens, main_num_strings = extract_tokens(main_text, exclusions)
+    main_wc, main_dur, main_rt, main_display_list = calculate_word_lists(
+        main_text_tokens, main_num_strings)
+
+    # 2. Process Additional
+    add_wc, add_dur, add_rt = 0, 0, 0
+    add_display_list = ()
+    if has_additional and add_text:
+        add_text_tokens, add_num_strings = extract_tokens(add_text, exclusions)
+        # Only count what Main hasn't already
+        add_wc, add_dur, add_rt, add_display_list = calculate_word_lists(
+            add_text_tokens, add_num_strings, main_text_tokens, main_num_strings)
+
+    return (main_wc, main_dur, main_rt, main_display_list,
+            add_wc, add_dur, add_rt, add_display_list)
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def detect_tips(main_text, add_text):
+    """Wording tips that depend only on the disclaimer text."""
+    tips = []
+    full_text_lower = (main_text + " " + add_text).lower()
+    tip_hits = {m.lastgroup for m in _TIP_RE.finditer(full_text_lower)}
+    words = frozenset(split_words(full_text_lower))
+
+    # 1. Symbol Words (Restored from V1.2)
+    if _SYMBOL_WORDS & words:
+        tips.append("**Symbols:** Using symbols (£, €, %, &) instead of full words ('pounds', 'percent') does not add to the word count.")
+
+    # 2. T&Cs
+    if "tcs" in tip_hits:
+        tips.append("**Huge Saving:** Change 'Terms and Conditions' (3 words) to 'T&Cs' (1 word). Saves 0.4s.")
+    elif "tcs_amp" in tip_hits:
+        tips.append("**Quick Fix:** Change 'Terms & Conditions' to 'T&Cs'. Saves 1 word (0.2s).")
+
+    # 3. "And" (a standalone word only; 'and&co' is one counted token, so no saving)
+    if "and" in words:
+        tips.append("**Space Saving:** Replace 'and' with '&' to reduce word count.")
+
+    # 4. Abbreviations
+    if "pa" in tip_hits:
+        tips.append("**Quick Fix:** Change 'per annum' (2 words) to 'p.a.' (1 word). Saves 0.2s.")
+    if "roi" in tip_hits:
+        tips.append("**Quick Fix:** Change 'Republic of Ireland' (3 words) to 'ROI' (1 word). Saves 0.4s.")
+
+    # 5. Formatting
+    if _MONTH_WORDS & words:
+        tips.append("**Formatting:** Writing dates out in full (e.g. 'January') is lengthy. Consider using numerals (e.g., '25.12.25').")
+    if "per" in tip_hits:
+        tips.append("**Formatting:** Use '/week' or '/month' instead of 'per week'/'per month' to save a word.")
+
+    return tuple(tips)
 
 # --- Streamlit UI ---
 
@@ -154,24 +144,9 @@ with col2:
     st.subheader("Results")
 
     if calc_btn and (main_text or add_text):
-        # 1. Process Main
-        main_text_tokens, main_num_strings = extract_tokens(main_text, brand_exclusions)
-        main_wc, main_display_list = calculate_word_lists(main_text_tokens, main_num_strings)
-        main_dur, main_rt = calculate_duration(main_wc)
-
-        # 2. Process Additional
-        add_display_list = []
-        if has_additional and add_text:
-            add_text_tokens, add_num_strings = extract_tokens(add_text, brand_exclusions)
-            # Filter against Main
-            main_text_set = {t.lower() for t in main_text_tokens}
-            unique_add_tokens = [t for t in add_text_tokens if t.lower() not in main_text_set]
-            
-            main_num_set = set(main_num_strings)
-            unique_add_nums = [n for n in add_num_strings if n not in main_num_set]
-            
-            add_wc, add_display_list = calculate_word_lists(unique_add_tokens, unique_add_nums)
-            add_dur, add_rt = calculate_duration(add_wc)
+        (main_wc, main_dur, main_rt, main_display_list,
+         add_wc, add_dur, add_rt, add_display_list) = calculate_totals(
+            main_text, add_text, brand_exclusions, has_additional)
 
         total_dur = main_dur + add_dur
 
@@ -206,47 +181,22 @@ with col2:
 st.markdown("---")
 st.subheader("Smart Optimization Tips")
 tips = []
-full_text = (main_text + " " + add_text)
-full_text_lower = full_text.lower()
-
-# 1. Merge Text Tip (Restored from V1.2)
-if has_additional and add_wc > 0:
-    # If added to main, you save the 'add_rt' (Recognition Time)
-    saving = add_rt
-    display_snip = add_text[:20] + "..." if len(add_text) > 20 else add_text
-    tips.append(f"**Structure:** Consider merging '{display_snip}' into the main disclaimer to save **{saving:.1f}s** (Recognition Time).")
-
-# 2. Symbol Words (Restored from V1.2)
-if any(word in full_text_lower for word in SYMBOL_WORDS):
-     tips.append("**Symbols:** Using symbols (£, €, %, &) instead of full words ('pounds', 'percent') does not add to the word count.")
-
-# 3. T&Cs
-if "terms and conditions" in full_text_lower:
-    tips.append("**Huge Saving:** Change 'Terms and Conditions' (3 words) to 'T&Cs' (1 word). Saves 0.4s.")
-elif "terms & conditions" in full_text_lower:
-    tips.append("**Quick Fix:** Change 'Terms & Conditions' to 'T&Cs'. Saves 1 word (0.2s).")
-
-# 4. "And"
-if re.search(r'\band\b', full_text_lower):
-    tips.append("**Space Saving:** Replace 'and' with '&' to reduce word count.")
-
-# 5. Abbreviations
-if "per annum" in full_text_lower:
-    tips.append("**Quick Fix:** Change 'per annum' (2 words) to 'p.a.' (1 word). Saves 0.2s.")
-if "republic of ireland" in full_text_lower:
-    tips.append("**Quick Fix:** Change 'Republic of Ireland' (3 words) to 'ROI' (1 word). Saves 0.4s.")
-
-# 6. Formatting
-if any(month in full_text_lower for month in MONTHS):
-    tips.append("**Formatting:** Writing dates out in full (e.g. 'January') is lengthy. Consider using numerals (e.g., '25.12.25').")
-if "per week" in full_text_lower or "per month" in full_text_lower:
-     tips.append("**Formatting:** Use '/week' or '/month' instead of 'per week'/'per month' to save a word.")
-
-if tips and (main_text or add_text):
-    for tip in tips:
-        st.info(tip, icon="💡")
-elif (main_text or add_text):
-    st.success("No obvious optimizations found. Good job!", icon="✅")
+
+if calc_btn and (main_text or add_text):
+    # Merge Text Tip (Restored from V1.2)
+    if has_additional and add_wc > 0:
+        # If added to main, you save the 'add_rt' (Recognition Time)
+        saving = add_rt
+        display_snip = add_text[:20] + "..." if len(add_text) > 20 else add_text
+        tips.append(f"**Structure:** Consider merging '{display_snip}' into the main disclaimer to save **{saving:.1f}s** (Recognition Time).")
+
+    tips.extend(detect_tips(main_text, add_text))
+
+    if tips:
+        for tip in tips:
+            st.info(tip, icon="💡")
+    else:
+        st.success("No obvious optimizations found. Good job!", icon="✅")
 
 # Footer
 st.markdown("---")